@@ -1,7 +1,23 @@
 # Imports
 from abc import ABC, abstractmethod # for abstract classes
 import json # for JSON file handling
+try:
+    import orjson # faster JSON library written in C, used when it is installed
+except ImportError:
+    orjson = None # falling back to the built-in json module
+try:
+    import msgpack # binary format, smaller and faster than JSON text
+except ImportError:
+    msgpack = None
+try:
+    import ijson # streaming JSON parser, used for very large files
+except ImportError:
+    ijson = None
 from datetime import datetime # for date handling
+import time # for the current time as a Unix timestamp
+import os # for file sizes
+import argparse # for command line options
+from contextlib import contextmanager # for the safe file writing helper
 
 # Custom Exception Classes
 class OutOfStockError(Exception):
@@ -15,100 +31,198 @@ class InvalidData(Exception):
 
 # Abstract Base Class
 class Product(ABC):
+    __slots__ = ("_product_id", "_name", "_name_lc", "_price", "_quantity_in_stock") # fixed attributes, no per-object __dict__ to save memory
+
     def __init__(self, product_id, name, price, quantity_in_stock):  # constructor
         self._product_id = product_id
         self._name = name
+        self._name_lc = name.lower() # lowercase name, worked out once for case insensitive search
         self._price = price
         self._quantity_in_stock = quantity_in_stock
 
-    @abstractmethod # abstract method
-    def restock(self, amount):
-        pass
+    def restock(self, amount): # same for every product type, so defined once here
+        self._quantity_in_stock += amount
 
-    @abstractmethod
     def sell(self, quantity):
+        if quantity > self._quantity_in_stock:
+            raise OutOfStockError("Sorry! This product does not have enough stock.")
+        self._quantity_in_stock -= quantity
+
+    @abstractmethod
+    def to_dict(self): # converting the common product fields into a dictionary, subclasses add their own fields
+        return {
+            "type": self.__class__.__name__,
+            "id": self._product_id,
+            "name": self._name,
+            "price": self._price,
+            "quantity": self._quantity_in_stock
+        }
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, d): # creating a product object from a dictionary made by to_dict
         pass
 
     def get_total_value(self):
         return self._price * self._quantity_in_stock
     
+    _FMT = "Product ID: {}\nProduct Name: {}\nProduct Price: {} PKR\nQuantity Of Product: {}" # display template, built once per class
+
     def __str__(self): # overriding the __str__ method to provide a string representation of the object
-        return f"Product ID: {self._product_id}\nProduct Name: {self._name}\nProduct Price: {self._price} PKR\nQuantity Of Product: {self._quantity_in_stock}"
+        return self._FMT.format(self._product_id, self._name, self._price, self._quantity_in_stock)
 
 # Subclasses of Product
 class Electronics(Product):
+    __slots__ = ("brand", "warranty_years")
+
     def __init__(self, product_id, name, price, quantity_in_stock, brand, warranty_years):
         super().__init__(product_id, name, price, quantity_in_stock)
         self.brand = brand
         self.warranty_years = warranty_years
 
-    def restock(self, amount):
-        self._quantity_in_stock += amount
+    def to_dict(self):
+        return {**super().to_dict(), "brand": self.brand, "warranty_years": self.warranty_years}
 
-    def sell(self, quantity):
-        if quantity > self._quantity_in_stock:
-            raise OutOfStockError("Sorry! This product does not have enough stock.")
-        self._quantity_in_stock -= quantity
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["id"], d["name"], d["price"], d["quantity"], d["brand"], d["warranty_years"])
+
+    _FMT = Product._FMT + "\nBrand Of Product: {}\nWarranty of Product: {} years"
 
     def __str__(self):  # overriding the __str__ method to include brand and warranty
-        return super().__str__() + f"\nBrand Of Product: {self.brand}\nWarranty of Product: {self.warranty_years} years"
+        return self._FMT.format(self._product_id, self._name, self._price, self._quantity_in_stock, self.brand, self.warranty_years)
 
 class Grocery(Product):
+    __slots__ = ("expiry_date", "_expiry_ts")
+
     def __init__(self, product_id, name, price, quantity_in_stock, expiry_date):
         super().__init__(product_id, name, price, quantity_in_stock)
-        self.expiry_date = datetime.strptime(expiry_date, "%Y-%m-%d") # converting string to datetime object
+        if isinstance(expiry_date, datetime): # already a datetime (e.g. loaded from a binary file)
+            self.expiry_date = expiry_date
+        else:
+            self.expiry_date = datetime.strptime(expiry_date, "%Y-%m-%d") # converting string to datetime object
+        self._expiry_ts = self.expiry_date.timestamp() # expiry as a Unix timestamp for quick comparisons
 
-    def restock(self, amount):
-        self._quantity_in_stock += amount
+    def is_expired(self):
+        return time.time() > self._expiry_ts # checking if the product is expired
 
-    def sell(self, quantity):
-        if quantity > self._quantity_in_stock:
-            raise OutOfStockError("Sorry! This product does not have enough stock.")
-        self._quantity_in_stock -= quantity
+    def to_dict(self):
+        return {**super().to_dict(), "expiry_date": self.expiry_date.strftime("%Y-%m-%d")}
 
-    def is_expired(self):
-        return datetime.now() > self.expiry_date # checking if the product is expired
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["id"], d["name"], d["price"], d["quantity"], d["expiry_date"])
+
+    _FMT = Product._FMT + "\nExpiry Date: {} | {}"
 
     def __str__(self): # overriding the __str__ method to include expiry date
         status = "Product is Expired" if self.is_expired() else "Product is not expired"
-        return super().__str__() + f"\nExpiry Date: {self.expiry_date.date()} | {status}"
+        return self._FMT.format(self._product_id, self._name, self._price, self._quantity_in_stock, self.expiry_date.date(), status)
 
 class Clothing(Product):
+    __slots__ = ("size", "material")
+
     def __init__(self, product_id, name, price, quantity_in_stock, size, material):
         super().__init__(product_id, name, price, quantity_in_stock)
         self.size = size
         self.material = material
 
-    def restock(self, amount):
-        self._quantity_in_stock += amount
+    def to_dict(self):
+        return {**super().to_dict(), "size": self.size, "material": self.material}
 
-    def sell(self, quantity):
-        if quantity > self._quantity_in_stock:
-            raise OutOfStockError("Sorry! This product does not have enough stock.")
-        self._quantity_in_stock -= quantity
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["id"], d["name"], d["price"], d["quantity"], d["size"], d["material"])
+
+    _FMT = Product._FMT + "\nSize: {}\nMaterial: {}"
 
     def __str__(self): # overriding the __str__ method to include size and material
-        return super().__str__() + f"\nSize: {self.size}\nMaterial: {self.material}"
+        return self._FMT.format(self._product_id, self._name, self._price, self._quantity_in_stock, self.size, self.material)
+
+# Lookup table used when loading products from a file
+_TYPE_MAP = {"Electronics": Electronics, "Grocery": Grocery, "Clothing": Clothing} # type name -> product class
+
+_STREAM_THRESHOLD = 100 * 1024 * 1024 # files bigger than this (100 MB) are parsed record by record with ijson
+
+def _read_bytes(filename): # reading a whole file into one buffer of the right size
+    buf = bytearray(os.path.getsize(filename))
+    with open(filename, "rb") as f:
+        n = f.readinto(buf) # fills buf directly, large reads skip the file object's own buffer
+        if n != len(buf) or f.read(1): # file got shorter or longer after its size was checked
+            raise InvalidData(f"The file {filename} changed while it was being read.")
+    return memoryview(buf) # parsers read from the buffer without copying it
+
+def _dumps(d): # converting one record into JSON bytes
+    if orjson is not None:
+        try:
+            out = orjson.dumps(d)
+        except TypeError: # orjson only handles integers up to 64 bits
+            pass
+        else:
+            if b"null" not in out: # orjson writes NaN/inf as null, any null (even inside a name) is redone by stdlib json
+                return out
+    return json.dumps(d, separators=(",", ":")).encode() # stdlib json handles both cases
+
+@contextmanager
+def _replace_file(filename): # writing to a temporary file that only replaces filename once everything is written
+    tmp = filename + ".tmp" # same directory, so os.replace does not have to copy across disks
+    try:
+        with open(tmp, "wb", buffering=1 << 20) as f:
+            yield f
+        os.replace(tmp, filename) # the old file stays untouched if writing failed
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def _file_stat(filename): # identifying the file contents by name, size and modification time
+    st = os.stat(filename)
+    return (filename, st.st_size, st.st_mtime_ns)
 
 # Inventory Class
 class Inventory:
     def __init__(self):
         self._products = {} # dictionary to store products with product_id as key
+        self._by_name_lc = {} # index: lowercase name -> list of products, used by search_by_name
+        self._by_type = {} # index: lowercase type name -> list of products, used by search_by_type
+        self._total_value = 0 # cached total of price * quantity for all products, None when it must be worked out again
+        self._groceries = set() # IDs of Grocery products, so the expiry sweep skips other types
+        self._dirty = True # True when the inventory changed since the last save_to_file
+        self._saved_stat = None # (filename, size, modification time) of the last file written by save_to_file
+
+    def _track(self, product): # adding product to the search indexes, clearing the cached total
+        self._dirty = True
+        self._total_value = None
+        self._by_name_lc.setdefault(product._name_lc, []).append(product)
+        self._by_type.setdefault(type(product).__name__.lower(), []).append(product)
+        if isinstance(product, Grocery):
+            self._groceries.add(product._product_id)
+
+    def _untrack(self, product): # removing product from the search indexes, clearing the cached total
+        self._dirty = True
+        self._total_value = None
+        for index, key in ((self._by_name_lc, product._name_lc), (self._by_type, type(product).__name__.lower())):
+            index[key].remove(product)
+            if not index[key]: # dropping empty lists so the indexes do not keep growing
+                del index[key]
+        self._groceries.discard(product._product_id)
 
     def add_product(self, product):
-        if product._product_id in self._products: # checking if product ID already exists
+        count = len(self._products)
+        self._products.setdefault(product._product_id, product) # adding product only if the ID is new, with a single lookup
+        if len(self._products) == count: # product ID already exists, nothing was added
             raise DuplicateIDError("The product ID you entered already exists.")
-        self._products[product._product_id] = product # adding product to the inventory
+        self._track(product)
 
     def remove_product(self, product_id): # removing product from the inventory
         if product_id in self._products:
-            del self._products[product_id]
+            self._untrack(self._products.pop(product_id))
 
     def search_by_name(self, name): # searching product by name
-        return [p for p in self._products.values() if p._name.lower() == name.lower()]  # case insensitive search
+        return list(self._by_name_lc.get(name.lower(), []))  # case insensitive search, copy so callers cannot change the index
     
     def search_by_type(self, product_type): # searching product by type
-        return [p for p in self._products.values() if type(p).__name__.lower() == product_type.lower()]
+        return list(self._by_type.get(product_type.lower(), []))
     
     def list_all_products(self): # listing all products
         return list(self._products.values())
@@ -116,145 +230,215 @@ class Inventory:
     def sell_product(self, product_id, quantity): # selling product
         if product_id not in self._products:
             raise KeyError("This product is not found.")
-        self._products[product_id].sell(quantity) 
+        self._products[product_id].sell(quantity) # raises OutOfStockError before anything changes
+        self._total_value = None
+        self._dirty = True
 
     def restock_product(self, product_id, quantity): # restocking product
         if product_id not in self._products:
             raise KeyError("This product is not found.")
         self._products[product_id].restock(quantity)
+        self._total_value = None
+        self._dirty = True
 
-    def total_inventory_value(self): # calculating total inventory value
-        return sum(p.get_total_value() for p in self._products.values())
+    def total_inventory_value(self): # calculating total inventory value, only again after add/remove/sell/restock
+        if self._total_value is None: # summed fresh, so no rounding error builds up over many changes
+            self._total_value = sum(p.get_total_value() for p in self._products.values())
+        return self._total_value
 
     def remove_expired_products(self): # removing expired products
-        expired_ids = [pid for pid, prod in self._products.items() # pid is product id and prod is product object
-                       if isinstance(prod, Grocery) and prod.is_expired()]
+        now_ts = time.time() # reading the current time only once for the whole sweep
+        expired_ids = [pid for pid in self._groceries # only grocery items can expire
+                       if self._products[pid]._expiry_ts < now_ts]
         for pid in expired_ids:  # removing expired products
-            del self._products[pid]
+            self.remove_product(pid)
+
+    def _load_records(self, data): # creating products from a list (or stream) of dictionaries
+        loaded = { # one dictionary lookup per record to find the product class, unknown types are skipped
+            d["id"]: _TYPE_MAP[d["type"]].from_dict(d)
+            for d in data if d["type"] in _TYPE_MAP
+        }
+        if not self._products: # empty inventory: use the new dictionary as it is instead of growing the old one
+            self._products = loaded
+            for p in loaded.values(): # filling indexes, running total and grocery set in one pass
+                self._track(p)
+            return
+        for pid, p in loaded.items(): # keeping the search indexes in sync
+            if pid in self._products: # a loaded product replaces the one with the same ID
+                self._untrack(self._products[pid])
+            self._track(p)
+        self._products.update(loaded)
 
     def save_to_file(self, filename): # saving inventory to a file
-        data = [] # list to store product data
-        for p in self._products.values():
-            d = { # dictionary to store product details
-                "type": p.__class__.__name__,
-                "id": p._product_id,
-                "name": p._name,
-                "price": p._price,
-                "quantity": p._quantity_in_stock
-            }
-            if isinstance(p, Electronics): #isinstance checks to determine the type of product
-                d.update({"Warranty Of Product": p.warranty_years, "Brand Of Product": p.brand}) # updating dictionary with product details
-            elif isinstance(p, Grocery):
-                d.update({"Expiry Date": p.expiry_date.strftime("%Y-%m-%d")})
-            elif isinstance(p, Clothing):
-                d.update({"Size OF Product": p.size, "Product Material": p.material})
-            data.append(d)
-        with open(filename, "w") as f: # writing data to file 
-            json.dump(data, f) # converting a Python object into a JSON string
+        if not self._dirty and os.path.exists(filename) and _file_stat(filename) == self._saved_stat:
+            return # nothing changed and the file is still the one we wrote, so there is nothing to save
+        with _replace_file(filename) as f: # writing records one by one, no full list kept in memory
+            f.write(b"[")
+            for i, p in enumerate(self._products.values()):
+                if i: # comma between records
+                    f.write(b",")
+                f.write(_dumps(p.to_dict())) # each product converts itself into a dictionary
+            f.write(b"]")
+        self._dirty = False # only reached when the file was fully written and replaced
+        self._saved_stat = _file_stat(filename)
 
     def load_from_file(self, filename): # loading inventory from a file
-        with open(filename, "r") as f: # reading data from file
-            data = json.load(f) # converting JSON string into a Python object
-            for d in data:
-                t = d["type"] # getting the type of product
-                if t == "Electronics":
-                    p = Electronics(d["ID Of Product"], d["Name"], d["Price"], d["Quantity"], d["Brand"], d["Warranty Of Product"])
-                elif t == "Grocery":
-                    p = Grocery(d["ID Of Product"], d["Name"], d["Price"], d["Quantity"], d["Expiry Date"])
-                elif t == "Clothing":
-                    p = Clothing(d["ID Of Product"], d["Name"], d["Price"], d["Quantity"], d["Size"], d["Material"])
-                else:
-                    continue
-                self._products[d["ID Of Product"]] = p
+        if ijson is not None and os.path.getsize(filename) > _STREAM_THRESHOLD: # huge file: never hold all records in memory
+            try:
+                with open(filename, "rb") as f:
+                    self._load_records(ijson.items(f, "item", use_float=True)) # products are created as each record is parsed
+                return
+            except ijson.JSONError: # NaN or Infinity (written by the stdlib json fallback), which ijson does not accept
+                pass # _load_records changes nothing until every record is parsed, so the normal path below can start over
+        if orjson is not None:
+            buf = _read_bytes(filename) # reading raw bytes for orjson
+            try:
+                data = orjson.loads(buf)
+            except orjson.JSONDecodeError: # NaN, Infinity or very large integers, which only stdlib json reads
+                data = json.loads(bytes(buf))
+        else:
+            with open(filename, "r") as f: # reading data from file
+                data = json.load(f) # converting JSON string into a Python object
+        self._load_records(data)
+
+    def save_to_msgpack(self, filename): # saving inventory to a binary msgpack file
+        if msgpack is None:
+            raise ImportError("msgpack is not installed. Install it with: pip install msgpack")
+        data = []
+        for p in self._products.values():
+            d = p.to_dict()
+            if type(p) is Grocery: # exact class check, storing expiry as a day number, no date formatting or timezone involved
+                d["expiry_date"] = p.expiry_date.toordinal()
+            data.append(d)
+        with _replace_file(filename) as f:
+            f.write(msgpack.packb(data, use_bin_type=True))
+
+    def load_from_msgpack(self, filename): # loading inventory from a binary msgpack file
+        if msgpack is None:
+            raise ImportError("msgpack is not installed. Install it with: pip install msgpack")
+        data = msgpack.unpackb(_read_bytes(filename), raw=False)
+        for d in data:
+            if d["type"] == "Grocery": # converting the day number back into a datetime object (midnight)
+                d["expiry_date"] = datetime.fromordinal(d["expiry_date"])
+        self._load_records(data)
+
+# menu handlers, each one runs a single menu option and reads answers with ask() (input, or a script file reader)
+def _add(inventory, ask):
+    ptype = ask("Enter Type Of Products (Electronics/Grocery/Clothing): ").lower()
+    pid = ask("Product ID: ")
+    name = ask("Name: ")
+    price = float(ask("Price: "))
+    qty = int(ask("Quantity: "))
+
+    try:
+        if ptype == "electronics":
+            brand = ask("Enter Brand Name: ")
+            warranty = int(ask("Warranty Of Product (years): "))
+            prod = Electronics(pid, name, price, qty, brand, warranty)
+        elif ptype == "grocery":
+            exp = ask("Expiry Date (YYYY-MM-DD): ")
+            prod = Grocery(pid, name, price, qty, exp)
+        elif ptype == "clothing":
+            size = ask("Size: ")
+            material = ask("Material: ")
+            prod = Clothing(pid, name, price, qty, size, material)
+        else:
+            print("Invalid Type! Please enter Electronics, Grocery, or Clothing.")
+            return
+
+        inventory.add_product(prod)
+        print("Product has been added.")
+    except EOFError: # input ended, let the main loop report it
+        raise
+    except Exception as e:  # catching any exception that occurs during product addition
+        print("Error:", e)
+
+def _sell(inventory, ask):
+    pid = ask("Product ID: ")
+    qty = int(ask("Quantity: "))
+    try:
+        inventory.sell_product(pid, qty)
+        print("Product is soldout.")
+    except Exception as e:  # catching any exception that occurs during product selling
+        print("Error:", e)
+
+def _search(inventory, ask):
+    mode = ask("Search by name/type: ").lower()
+    if mode == "name":
+        name = ask("Enter name of product: ")
+        for p in inventory.search_by_name(name):
+            print(p)
+    elif mode == "type":
+        typ = ask("Enter type of product: ")
+        for p in inventory.search_by_type(typ):
+            print(p)
+    else:
+        print("Invalid search mode! Please try again.")
+
+def _view_all(inventory, ask):
+    for p in inventory.list_all_products():
+        print(p)
+        print("-" * 50)
+
+def _save(inventory, ask):
+    f = ask("Filename: ") # getting filename from user only in json format like "filename.json"
+    inventory.save_to_file(f)
+    print("Inventory details is saved.")
+
+def _load(inventory, ask):
+    f = ask("Filename: ")
+    inventory.load_from_file(f) # loading inventory from file, same file used in saving
+    print("Inventory loaded.")
+
+def _exit(inventory, ask):
+    print("Thankyou! For Using this program.")
+    return True # telling the main loop to stop
+
+_HANDLERS = {"1": _add, "2": _sell, "3": _search, "4": _view_all, "5": _save, "6": _load, "7": _exit} # menu choice -> handler
+
+_MENU = "\n1. Add Product\n2. Sell Product\n3. Search Product\n4. View All Products\n5. Save Inventory\n6. Load Inventory\n7. Exit"
 
 # main function to run the program
-def main():
+def main(argv=None): # argv is for tests, normally the command line is used
+    parser = argparse.ArgumentParser(description="Inventory Management System")
+    parser.add_argument("--script", help="file with one answer per line, read instead of typing at the prompt")
+    args = parser.parse_args(argv)
+
+    if args.script is None:
+        _run(input, batch=False)
+    else:
+        with open(args.script) as f: # batch mode: answers are read from the script file
+            _run(_script_reader(f), batch=True)
+
+def _script_reader(f): # ask() for batch mode: returns the next line of the script, prompts are not printed
+    def ask(prompt):
+        line = f.readline()
+        if not line: # end of the script file
+            raise EOFError
+        return line.rstrip("\r\n")
+    return ask
+
+def _run(ask, batch): # main menu loop
     inventory = Inventory()
     print("================= Welcome to the Inventory Management System ================")
 
     while True:
-        print("\n1. Add Product")
-        print("2. Sell Product")
-        print("3. Search Product")
-        print("4. View All Products")
-        print("5. Save Inventory")
-        print("6. Load Inventory")
-        print("7. Exit")
-
-        choice = input("Enter Your Choice: ")
-
-        if choice == "1":
-            ptype = input("Enter Type Of Products (Electronics/Grocery/Clothing): ").lower()
-            pid = input("Product ID: ")
-            name = input("Name: ")
-            price = float(input("Price: "))
-            qty = int(input("Quantity: "))
-
-            try:
-                if ptype == "electronics":
-                    brand = input("Enter Brand Name: ")
-                    warranty = int(input("Warranty Of Product (years): "))
-                    prod = Electronics(pid, name, price, qty, brand, warranty)
-                elif ptype == "grocery":
-                    exp = input("Expiry Date (YYYY-MM-DD): ")
-                    prod = Grocery(pid, name, price, qty, exp)
-                elif ptype == "clothing":
-                    size = input("Size: ")
-                    material = input("Material: ")
-                    prod = Clothing(pid, name, price, qty, size, material)
-                else:
-                    print("Invalid Type! Please enter Electronics, Grocery, or Clothing.")
-                    continue
-
-                inventory.add_product(prod)
-                print("Product has been added.")
-            except Exception as e:  # catching any exception that occurs during product addition
-                print("Error:", e)
-
-        elif choice == "2":
-            pid = input("Product ID: ")
-            qty = int(input("Quantity: "))
-            try:
-                inventory.sell_product(pid, qty)
-                print("Product is soldout.")
-            except Exception as e:  # catching any exception that occurs during product selling
-                print("Error:", e)
-
-        elif choice == "3":
-            mode = input("Search by name/type: ").lower()
-            if mode == "name":
-                name = input("Enter name of product: ")
-                for p in inventory.search_by_name(name):
-                    print(p)
-            elif mode == "type":
-                typ = input("Enter type of product: ")
-                for p in inventory.search_by_type(typ):
-                    print(p)
-            else:
-                print("Invalid search mode! Please try again.")
-
-        elif choice == "4":
-            for p in inventory.list_all_products():
-                print(p)
-                print("-" * 50)
-
-        elif choice == "5":
-            f = input("Filename: ") # getting filename from user only in json format like "filename.json"
-            inventory.save_to_file(f)
-            print("Inventory details is saved.")
-
-        elif choice == "6":
-            f = input("Filename: ")
-            inventory.load_from_file(f) # loading inventory from file, same file used in saving
-            print("Inventory loaded.")
-
-        elif choice == "7":
-            print("Thankyou! For Using this program.")
+        if not batch: # menu is only needed when a person is typing
+            print(_MENU)
+
+        fn = None
+        try:
+            choice = ask("Enter Your Choice: ")
+            fn = _HANDLERS.get(choice)
+            if fn is None:
+                print("Invalid choice! Please try again.")
+            elif fn(inventory, ask):
+                break
+        except EOFError: # input ended
+            if fn is not None: # it ended in the middle of an operation
+                print("\nInput ended before the operation was finished, it was not completed.")
             break
 
-        else:
-            print("Invalid choice! Please try again.")
-
 # calling main function
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,373 @@
+# Tests for main.py, run with: python -m unittest
+import io
+import json
+import math
+import os
+import pickle
+import tempfile
+import time
+import types
+import unittest
+
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import main
+from main import Inventory, Electronics, Grocery, Clothing
+
+
+def _sample_inventory():
+    inv = Inventory()
+    inv.add_product(Electronics("E1", "Laptop", 60000.0, 3, "Dell", 2))
+    inv.add_product(Grocery("G1", "Milk", 250.0, 10, "2020-01-01")) # already expired
+    inv.add_product(Grocery("G2", "Rice", 300.0, 5, "2099-01-01"))
+    inv.add_product(Clothing("C1", "Shirt", 1500.0, 4, "M", "Cotton"))
+    return inv
+
+
+class SearchIndexTest(unittest.TestCase):
+    def assert_indexes_match(self, inv): # indexes must agree with a plain scan over the products
+        products = inv.list_all_products()
+        for name in {p._name.lower() for p in products} | {"missing"}:
+            self.assertCountEqual(inv.search_by_name(name.upper()), [p for p in products if p._name.lower() == name])
+        for typ in ("electronics", "grocery", "clothing"):
+            self.assertCountEqual(inv.search_by_type(typ), [p for p in products if type(p).__name__.lower() == typ])
+        self.assertEqual(set(inv._by_name_lc), {p._name.lower() for p in products})
+        self.assertEqual(set(inv._by_type), {type(p).__name__.lower() for p in products})
+        self.assertEqual(inv._groceries, {p._product_id for p in products if isinstance(p, Grocery)})
+
+    def test_add_and_remove(self):
+        inv = _sample_inventory()
+        self.assert_indexes_match(inv)
+        inv.remove_product("E1")
+        inv.remove_product("C1")
+        self.assert_indexes_match(inv)
+        self.assertNotIn("laptop", inv._by_name_lc)
+        self.assertNotIn("electronics", inv._by_type)
+
+    def test_duplicate_id_is_rejected(self):
+        inv = _sample_inventory()
+        milk = inv.search_by_name("milk")[0]
+        total = inv.total_inventory_value()
+        for duplicate in (Grocery("G1", "Bread", 100.0, 2, "2099-01-01"), milk): # other product with the same ID, and the same product again
+            with self.assertRaises(main.DuplicateIDError):
+                inv.add_product(duplicate)
+            self.assertIs(inv._products["G1"], milk)
+            self.assertEqual(inv.search_by_name("milk"), [milk])
+            self.assertEqual(inv.search_by_name("bread"), [])
+            self.assertNotIn("bread", inv._by_name_lc)
+            self.assertEqual(len(inv._by_type["grocery"]), 2)
+            self.assertEqual(inv._groceries, {"G1", "G2"})
+            self.assertEqual(inv.total_inventory_value(), total)
+            self.assert_indexes_match(inv)
+
+    def test_remove_expired(self):
+        inv = _sample_inventory()
+        inv.remove_expired_products()
+        self.assertEqual([p._product_id for p in inv.list_all_products()], ["E1", "G2", "C1"])
+        self.assert_indexes_match(inv)
+
+    def test_load_merges_into_existing_inventory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "inventory.json")
+            _sample_inventory().save_to_file(filename)
+            inv = Inventory()
+            inv.add_product(Clothing("C1", "Jeans", 2000.0, 1, "L", "Denim")) # replaced by the loaded C1
+            inv.add_product(Clothing("C2", "Scarf", 500.0, 2, "S", "Wool"))
+            inv.load_from_file(filename)
+            inv.load_from_file(filename) # loading twice must not duplicate index entries
+        self.assertEqual(inv.search_by_name("jeans"), [])
+        self.assertEqual(len(inv.list_all_products()), 5)
+        self.assert_indexes_match(inv)
+
+
+class TotalValueTest(unittest.TestCase):
+    def assert_total_matches(self, inv): # cached total must equal a fresh sum of the product values
+        self.assertEqual(inv.total_inventory_value(), sum(p.get_total_value() for p in inv.list_all_products()))
+
+    def test_no_rounding_error_builds_up(self):
+        inv = Inventory()
+        inv.add_product(Clothing("C1", "Shirt", 0.1, 1, "M", "Cotton"))
+        inv.add_product(Clothing("C2", "Scarf", 0.2, 1, "S", "Wool"))
+        inv.remove_product("C1")
+        self.assertEqual(inv.total_inventory_value(), 0.2)
+        inv.remove_product("C2")
+        self.assertEqual(inv.total_inventory_value(), 0)
+
+    def test_add_sell_restock_remove(self):
+        inv = _sample_inventory()
+        inv.add_product(Clothing("C2", "Scarf", 0.1, 7, "S", "Wool"))
+        self.assert_total_matches(inv)
+        inv.sell_product("E1", 2)
+        inv.sell_product("C2", 3)
+        inv.restock_product("G2", 4)
+        inv.restock_product("C2", 10)
+        self.assert_total_matches(inv)
+        with self.assertRaises(main.OutOfStockError):
+            inv.sell_product("C1", 100)
+        self.assert_total_matches(inv)
+        inv.remove_product("E1")
+        inv.remove_expired_products()
+        self.assert_total_matches(inv)
+
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "inventory.json")
+            _sample_inventory().save_to_file(filename)
+            inv = Inventory()
+            inv.add_product(Clothing("C1", "Jeans", 2000.0, 1, "L", "Denim")) # replaced by the loaded C1
+            inv.load_from_file(filename)
+        self.assert_total_matches(inv)
+
+    def test_nan_price(self):
+        inv = _sample_inventory()
+        inv.add_product(Clothing("C2", "Scarf", float("nan"), 1, "S", "Wool"))
+        self.assertTrue(math.isnan(inv.total_inventory_value()))
+        inv.remove_product("C2")
+        self.assert_total_matches(inv)
+
+
+class SkipUnchangedSaveTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "inventory.json")
+        self.inv = _sample_inventory()
+        self.inv.save_to_file(self.filename)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def written(self): # each real save replaces the file, so it gets a new inode
+        before = os.stat(self.filename).st_ino
+        self.inv.save_to_file(self.filename)
+        return os.stat(self.filename).st_ino != before
+
+    def test_unchanged_inventory_is_not_rewritten(self):
+        self.assertFalse(self.written())
+
+    def test_changes_are_saved(self):
+        for change in (lambda inv: inv.sell_product("E1", 1),
+                       lambda inv: inv.restock_product("C1", 1),
+                       lambda inv: inv.add_product(Clothing("C2", "Scarf", 500.0, 2, "S", "Wool")),
+                       lambda inv: inv.remove_product("C2"),
+                       lambda inv: inv.remove_expired_products()):
+            change(self.inv)
+            self.assertTrue(self.written())
+            self.assertFalse(self.written())
+        loaded = Inventory()
+        loaded.load_from_file(self.filename)
+        self.assertEqual([str(p) for p in loaded.list_all_products()],
+                         [str(p) for p in self.inv.list_all_products()])
+
+    def test_loading_marks_inventory_changed(self):
+        self.inv.load_from_file(self.filename)
+        self.assertTrue(self.written())
+
+    def test_other_file_is_written(self):
+        other = os.path.join(self.tmp.name, "other.json")
+        self.inv.save_to_file(other)
+        self.assertTrue(os.path.exists(other))
+
+    def test_file_changed_by_someone_else_is_rewritten(self):
+        with open(self.filename, "w") as f:
+            f.write("[]")
+        self.inv.save_to_file(self.filename)
+        loaded = Inventory()
+        loaded.load_from_file(self.filename)
+        self.assertEqual(len(loaded.list_all_products()), 4)
+
+
+class SaveLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "inventory.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        inv = Inventory()
+        inv.add_product(Electronics("E1", "Laptop", 60000.0, 3, "Dell", 2))
+        inv.add_product(Grocery("G1", "Milk", 250.0, 10, "2030-03-10"))
+        inv.add_product(Clothing("C1", "Shirt", 1500.0, 4, "M", "Cotton"))
+        inv.save_to_file(self.filename)
+
+        loaded = Inventory()
+        loaded.load_from_file(self.filename)
+        self.assertEqual([str(p) for p in loaded.list_all_products()],
+                         [str(p) for p in inv.list_all_products()])
+
+    def test_values_orjson_cannot_write(self): # NaN/inf prices and integers wider than 64 bits
+        inv = Inventory()
+        inv.add_product(Clothing("C1", "Shirt", float("nan"), 1, "M", "Cotton"))
+        inv.add_product(Clothing("C2", "Shirt", float("inf"), 1, "M", "Cotton"))
+        inv.add_product(Clothing("C3", "Shirt", 1.5, 10**20, "M", "Cotton"))
+        inv.save_to_file(self.filename)
+
+        loaded = Inventory()
+        loaded.load_from_file(self.filename)
+        products = loaded.list_all_products()
+        self.assertTrue(math.isnan(products[0]._price))
+        self.assertEqual(products[1]._price, float("inf"))
+        self.assertEqual(products[2]._quantity_in_stock, 10**20)
+
+    def test_failed_save_keeps_previous_file(self):
+        inv = Inventory()
+        inv.add_product(Clothing("C1", "Shirt", 1500.0, 4, "M", "Cotton"))
+        inv.save_to_file(self.filename)
+        with open(self.filename, "rb") as f:
+            before = f.read()
+
+        inv.add_product(Clothing("C2", "Scarf", 500.0, 2, "S", object())) # cannot be written as JSON
+        with self.assertRaises(TypeError):
+            inv.save_to_file(self.filename)
+        with open(self.filename, "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(os.listdir(self.tmp.name), ["inventory.json"]) # no temporary file left behind
+        self.assertTrue(inv._dirty) # the failed save does not count as saved
+
+    @unittest.skipIf(main.orjson is None, "the buffered read is only used with orjson")
+    def test_file_changing_size_while_read(self):
+        with open(self.filename, "wb") as f:
+            f.write(b"[]")
+        real_getsize = os.path.getsize
+        for wrong_size in (1, 5): # reported size shorter and longer than the real file
+            os.path.getsize = lambda filename: wrong_size
+            try:
+                with self.assertRaises(main.InvalidData):
+                    Inventory().load_from_file(self.filename)
+            finally:
+                os.path.getsize = real_getsize
+
+    def test_null_inside_a_name(self): # a record containing null is written by stdlib json, the result must be the same
+        inv = Inventory()
+        inv.add_product(Clothing("C1", "null", 1500.0, 4, "M", "Cotton"))
+        inv.save_to_file(self.filename)
+        loaded = Inventory()
+        loaded.load_from_file(self.filename)
+        self.assertEqual(loaded.list_all_products()[0]._name, "null")
+
+    def test_round_trip_without_orjson(self):
+        saved_orjson, main.orjson = main.orjson, None
+        try:
+            self.test_round_trip()
+        finally:
+            main.orjson = saved_orjson
+
+
+# stand-in for msgpack when it is not installed, the tests check our record conversion, not msgpack itself
+_fake_msgpack = types.SimpleNamespace(packb=lambda data, use_bin_type: pickle.dumps(data),
+                                      unpackb=lambda data, raw: pickle.loads(bytes(data)))
+
+
+class _FakeIjsonError(ValueError):
+    pass
+
+def _fake_ijson_items(f, prefix, use_float): # like ijson, rejects NaN and Infinity
+    def reject(name):
+        raise _FakeIjsonError(f"invalid token {name}")
+    _fake_ijson.calls += 1
+    yield from json.load(f, parse_constant=reject)
+
+# stand-in for ijson when it is not installed
+_fake_ijson = types.SimpleNamespace(items=_fake_ijson_items, JSONError=_FakeIjsonError, calls=0)
+
+
+class StreamingLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "inventory.json")
+        self.saved = main.ijson, main._STREAM_THRESHOLD
+        main.ijson = main.ijson or _fake_ijson
+        main._STREAM_THRESHOLD = 0 # every file counts as huge
+        _fake_ijson.calls = 0
+
+    def tearDown(self):
+        main.ijson, main._STREAM_THRESHOLD = self.saved
+        self.tmp.cleanup()
+
+    def load(self, inv):
+        inv.save_to_file(self.filename)
+        loaded = Inventory()
+        loaded.load_from_file(self.filename)
+        self.assertEqual([str(p) for p in loaded.list_all_products()], [str(p) for p in inv.list_all_products()])
+        return loaded
+
+    def test_streaming_load(self):
+        loaded = self.load(_sample_inventory())
+        self.assertEqual(loaded.total_inventory_value(), _sample_inventory().total_inventory_value())
+        if main.ijson is _fake_ijson:
+            self.assertEqual(_fake_ijson.calls, 1)
+
+    def test_nan_price_falls_back_to_normal_load(self):
+        inv = _sample_inventory()
+        inv.add_product(Clothing("C2", "Scarf", float("nan"), 1, "S", "Wool"))
+        inv.add_product(Clothing("C3", "Hat", float("inf"), 1, "S", "Wool"))
+        loaded = self.load(inv)
+        self.assertEqual(len(loaded.list_all_products()), 6)
+        self.assertEqual(len(loaded.search_by_type("clothing")), 3) # no index entries left over from the failed stream
+
+
+class MsgpackTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "inventory.msgpack")
+        self.saved_msgpack = main.msgpack
+        main.msgpack = main.msgpack or _fake_msgpack
+        self.saved_tz = os.environ.get("TZ")
+
+    def tearDown(self):
+        main.msgpack = self.saved_msgpack
+        if self.saved_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self.saved_tz
+        time.tzset()
+        self.tmp.cleanup()
+
+    def _set_tz(self, tz):
+        os.environ["TZ"] = tz
+        time.tzset()
+
+    def test_expiry_date_does_not_depend_on_timezone(self):
+        self._set_tz("Asia/Karachi")
+        inv = Inventory()
+        inv.add_product(Grocery("G1", "Milk", 250.0, 10, "2030-03-10"))
+        inv.save_to_msgpack(self.filename)
+
+        self._set_tz("UTC")
+        loaded = Inventory()
+        loaded.load_from_msgpack(self.filename)
+        self.assertEqual(loaded.list_all_products()[0].expiry_date, datetime(2030, 3, 10))
+
+
+class ScriptModeTest(unittest.TestCase):
+    def run_script(self, text):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "commands.txt")
+            with open(script, "w") as f:
+                f.write(text)
+            out = io.StringIO()
+            with redirect_stdout(out):
+                main.main(["--script", script])
+        return out.getvalue()
+
+    def test_commands_run_without_prompts(self):
+        out = self.run_script("1\nclothing\nC1\nShirt\n1500\n4\nM\nCotton\n4\n7\n")
+        self.assertIn("Product has been added.\n", out)
+        self.assertIn("Product ID: C1\n", out)
+        self.assertNotIn("Enter Your Choice", out)
+        self.assertTrue(out.endswith("Thankyou! For Using this program.\n"))
+
+    def test_script_ending_inside_an_operation(self):
+        out = self.run_script("1\ngrocery\n")
+        self.assertIn("not completed", out)
+
+    def test_script_ending_at_a_product_type_question(self): # expiry date question is inside _add's try block
+        out = self.run_script("1\ngrocery\nG1\nMilk\n5\n3\n")
+        self.assertIn("not completed", out)
+        self.assertNotIn("Error:", out)
+
+
+if __name__ == "__main__":
+    unittest.main()